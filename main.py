@@ -3,6 +3,7 @@
 Job Tracker - Daily scraping of Bulgarian IT job sites
 """
 
+import argparse
 import logging
 import sys
 import os
@@ -15,6 +16,7 @@ scrapers_dir = current_dir / "scrapers"
 sys.path.insert(0, str(scrapers_dir))
 
 # Import scrapers
+from base_scraper import Deadline
 from dev_bg_scraper import DevBgScraper
 from jobs_bg_scraper import JobsBgScraper
 
@@ -24,22 +26,69 @@ from utils import (
     save_job_data,
     commit_and_push_changes,
     setup_logging,
-    format_job_data_row
+    LOG_FILE
 )
+from records import JobRecord
+from profiling import RunProfiler, profile_stage
 
 # Configuration
 LOG_LEVEL = "INFO"
-
-
-def main():
+RUN_TIMEOUT = 900  # seconds for the whole run
+SITE_TIMEOUT = 300  # seconds per site
+PARTIAL_NOTE = "Partial: deadline exceeded"
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Daily scraping of Bulgarian IT job sites")
+    parser.add_argument("--config", type=Path, default=None,
+                        help="Path to an alternative sites.json (e.g. pointing at a local fixture server)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Scrape only, do not save CSV data or commit")
+    parser.add_argument("--run-timeout", type=float, default=RUN_TIMEOUT,
+                        help=f"Time budget for the whole run in seconds (default {RUN_TIMEOUT})")
+    parser.add_argument("--site-timeout", type=float, default=SITE_TIMEOUT,
+                        help=f"Time budget per site in seconds (default {SITE_TIMEOUT})")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run with cProfile and tracemalloc")
+    parser.add_argument("--profile-sampling", action="store_true",
+                        help="Profile with the pyinstrument sampling profiler instead of per-stage cProfile (implies --profile)")
+    parser.add_argument("--profile-dir", type=Path, default=None,
+                        help="Directory for profile artifacts (default: profiles/ next to the log)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main scraping function"""
+    args = parse_args(argv)
     setup_logging(LOG_LEVEL)
     logger = logging.getLogger(__name__)
 
     logger.info("=== Starting Job Tracker ===")
 
+    profiler = None
+    if args.profile or args.profile_sampling:
+        profile_dir = args.profile_dir or LOG_FILE.parent / "profiles"
+        profiler = RunProfiler(profile_dir, sampling=args.profile_sampling)
+        profiler.start()
+
+    try:
+        return run(args, profiler)
+    finally:
+        if profiler:
+            profiler.stop()
+
+
+def run(args, profiler=None):
+    """Run the scrape pipeline"""
+    logger = logging.getLogger(__name__)
+
+    # Overall time budget; sites get what is left, capped at site_timeout
+    run_deadline = Deadline(args.run_timeout)
+
     # Load configuration
-    sites_config = load_sites_config()
+    with profile_stage(profiler, "config"):
+        sites_config = load_sites_config(args.config)
     if not sites_config:
         logger.error("No sites configuration found")
         return False
@@ -62,17 +111,29 @@ def main():
             logger.warning(f"No configuration found for {site_name}")
             continue
 
+        if run_deadline.expired():
+            logger.warning(f"Run deadline exceeded, skipping {site_name}")
+            all_data_rows.append(JobRecord.from_results(site_name, {}, current_date, PARTIAL_NOTE))
+            continue
+
         logger.info(f"\n--- Scraping {site_name} ---")
 
         try:
-            # Initialize scraper
-            scraper = scraper_class(sites_config[site_name])
-
-            # Perform scraping
-            results = scraper.scrape()
-
-            # Format and store results
-            data_row = format_job_data_row(site_name, results, current_date)
+            with profile_stage(profiler, "scrape", site_name):
+                # Initialize scraper
+                scraper = scraper_class(sites_config[site_name])
+                scraper.profiler = profiler
+                scraper.deadline = run_deadline.child(args.site_timeout)
+
+                # Perform scraping
+                results = scraper.scrape()
+
+            # Format and store results, marking runs cut short by the deadline
+            notes = "Daily scraping"
+            if scraper.deadline_exceeded:
+                logger.warning(f"Deadline exceeded for {site_name}, saving partial results")
+                notes = PARTIAL_NOTE
+            data_row = JobRecord.from_results(site_name, results, current_date, notes)
             all_data_rows.append(data_row)
 
             # Log results
@@ -84,22 +145,24 @@ def main():
         except Exception as e:
             logger.error(f"Error scraping {site_name}: {e}")
             # Add error row
-            error_row = format_job_data_row(
-                site_name,
-                {'total': None, 'ruse': None, 'remote': None},
-                current_date,
-                f"Error: {str(e)}"
-            )
+            error_row = JobRecord.from_results(site_name, {}, current_date, f"Error: {str(e)}")
             all_data_rows.append(error_row)
 
+    if args.dry_run:
+        logger.info("Dry run, skipping save and commit")
+        return bool(all_data_rows)
+
     # Save data to CSV
     if all_data_rows:
         try:
-            csv_path = save_job_data(all_data_rows, current_date)
+            with profile_stage(profiler, "save"):
+                csv_path = save_job_data(all_data_rows, current_date)
             logger.info(f"Data saved successfully to {csv_path}")
 
             # Commit and push to git
-            if commit_and_push_changes(csv_path, current_date):
+            with profile_stage(profiler, "commit"):
+                committed = commit_and_push_changes(csv_path, current_date)
+            if committed:
                 logger.info("Changes committed and pushed to repository")
             else:
                 logger.warning("Failed to commit/push changes")
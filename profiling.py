@@ -0,0 +1,193 @@
+"""
+Profiling support for the scrape pipeline
+"""
+
+import cProfile
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+# Number of entries kept in the text reports
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+def _slug(value: str) -> str:
+    """Make a value safe for use in a file name"""
+    return "".join(c if c.isalnum() else "_" for c in value)
+
+
+class RunProfiler:
+    """Collects per-stage timing, cProfile and tracemalloc data for one run
+
+    Top-level stages (config, each site, save, commit) get their own cProfile
+    dump and allocation report. Nested stages inside the scrapers (fetch,
+    parse, get_text, regex, ...) are cheap counters of wall time and memory,
+    attributed to the enclosing site.
+
+    cProfile only sees the thread that enabled it, so work done in helper
+    threads (the scrapers' HTTP requests) is profiled separately via
+    thread() and merged into the enclosing top-level stage's dump.
+
+    cProfile and pyinstrument both hook in through the interpreter's profile
+    function, so with sampling enabled the per-stage cProfile dumps are
+    skipped and the sampler covers the whole run instead.
+    """
+
+    def __init__(self, output_dir: Path, sampling: bool = False):
+        self.run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.output_dir = Path(output_dir) / self.run_id
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+        self.stats: Dict[str, Dict] = {}
+        self._depth = 0
+        self._site: Optional[str] = None
+        self._sampler = None
+        self._thread_profiles = []
+        self._thread_lock = threading.Lock()
+
+        if sampling:
+            try:
+                from pyinstrument import Profiler
+                self._sampler = Profiler()
+            except ImportError:
+                self.logger.warning("pyinstrument not installed, sampling profiler disabled")
+
+    def start(self) -> None:
+        """Start memory tracing and the optional sampling profiler"""
+        tracemalloc.start(25)
+        if self._sampler:
+            self._sampler.start()
+        self.logger.info(f"Profiling enabled, writing artifacts to {self.output_dir}")
+
+    def stop(self) -> Path:
+        """Stop profiling and write the run summary"""
+        if self._sampler:
+            self._sampler.stop()
+            with open(self.output_dir / "sampling.html", 'w', encoding='utf-8') as f:
+                f.write(self._sampler.output_html())
+
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        summary = {
+            'run_id': self.run_id,
+            'memory_current_bytes': current,
+            'memory_peak_bytes': peak,
+            'stages': self.stats
+        }
+        summary_path = self.output_dir / "summary.json"
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        self.logger.info(f"Profile summary written to {summary_path}")
+        for key, entry in sorted(self.stats.items(), key=lambda x: -x[1]['seconds']):
+            self.logger.info(
+                f"  {key}: {entry['seconds']:.3f}s in {entry['calls']} call(s), "
+                f"{entry['memory_delta_bytes'] / 1024:.1f} KiB retained"
+            )
+        return summary_path
+
+    @contextmanager
+    def stage(self, name: str, site: Optional[str] = None):
+        """Profile a pipeline stage, optionally attributed to a site"""
+        site = site or self._site
+        key = f"{site}/{name}" if site else name
+        top_level = self._depth == 0
+
+        previous_site = self._site
+        self._site = site
+        self._depth += 1
+
+        profile = cProfile.Profile() if top_level and self._sampler is None else None
+        if top_level:
+            with self._thread_lock:
+                self._thread_profiles = []
+            tracemalloc.reset_peak()
+            snapshot_before = tracemalloc.take_snapshot()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+
+            elapsed = time.perf_counter() - started
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+
+            entry = self.stats.setdefault(key, {
+                'site': site,
+                'stage': name,
+                'calls': 0,
+                'seconds': 0.0,
+                'memory_delta_bytes': 0
+            })
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            entry['memory_delta_bytes'] += memory_after - memory_before
+
+            if top_level:
+                entry['memory_peak_bytes'] = max(entry.get('memory_peak_bytes', 0), memory_peak)
+                self._write_stage_artifacts(key, profile, snapshot_before)
+
+            self._depth -= 1
+            self._site = previous_site
+
+    @contextmanager
+    def thread(self):
+        """Profile work in a helper thread, merged into the current top-level stage
+
+        Threads still running when the stage ends are not included.
+        """
+        if self._sampler is not None or self._depth == 0:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._thread_lock:
+                self._thread_profiles.append(profile)
+
+    def _write_stage_artifacts(self, key: str, profile: Optional[cProfile.Profile], snapshot_before) -> None:
+        """Write cProfile dump and reports for a top-level stage"""
+        base = self.output_dir / _slug(key)
+
+        if profile:
+            stats = pstats.Stats(profile)
+            with self._thread_lock:
+                if self._thread_profiles:
+                    stats.add(*self._thread_profiles)
+                self._thread_profiles = []
+
+            stats.dump_stats(f"{base}.prof")
+            with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                stats.stream = f
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+
+        snapshot_after = tracemalloc.take_snapshot()
+        with open(f"{base}.alloc.txt", 'w', encoding='utf-8') as f:
+            for diff in snapshot_after.compare_to(snapshot_before, 'lineno')[:TOP_ALLOCATIONS]:
+                f.write(f"{diff}\n")
+
+
+def profile_stage(profiler: Optional[RunProfiler], name: str, site: Optional[str] = None):
+    """Return a stage context manager, or a no-op one when profiling is off"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name, site)
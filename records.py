@@ -0,0 +1,250 @@
+"""
+Typed in-memory representation of job-count records
+"""
+
+import csv
+import logging
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+DATE_FORMAT = "%Y-%m-%d"
+# Sentinel stored in the integer columns for missing counts
+MISSING_COUNT = -1
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _parse_count(value) -> Optional[int]:
+    """Parse a CSV cell into an int count, None when empty or invalid"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            logging.debug(f"Invalid count value: {value!r}")
+            return None
+
+
+def _escape_category(name: str) -> str:
+    """Escape the characters used as separators in Categories_Detail"""
+    return name.replace("\\", "\\\\").replace(",", "\\,").replace(":", "\\:")
+
+
+def parse_categories(detail: Optional[str]) -> Dict[str, int]:
+    """Parse a "cat1:123, cat2:456" string into a category mapping
+
+    Backslash escapes ("\\,", "\\:", "\\\\") written by format_categories are
+    honoured. Raises ValueError for entries that are not "name:count".
+    """
+    categories = {}
+    if not detail:
+        return categories
+
+    entries = []
+    name, current = None, []
+    chars = iter(detail)
+    for char in chars:
+        if char == "\\":
+            current.append(next(chars, "\\"))
+        elif char == ",":
+            entries.append((name, "".join(current)))
+            name, current = None, []
+        elif char == ":" and name is None:
+            name, current = "".join(current), []
+        elif char == ":":
+            # Legacy unescaped colon in a name - the count follows the last one
+            name, current = f"{name}:{''.join(current)}", []
+        else:
+            current.append(char)
+    entries.append((name, "".join(current)))
+
+    for name, count in entries:
+        value = _parse_count(count.strip())
+        if not name or not name.strip() or value is None:
+            raise ValueError(f"Invalid category entry in {detail!r}")
+        categories[name.strip()] = value
+
+    return categories
+
+
+def format_categories(categories: Dict[str, int]) -> str:
+    """Format a category mapping as "cat1:123, cat2:456" (reversible)"""
+    return ", ".join([f"{_escape_category(k)}:{v}" for k, v in categories.items()])
+
+
+@dataclass
+class JobRecord:
+    """Single job-count record for one site on one day"""
+
+    __slots__ = ('date', 'site', 'total', 'ruse', 'remote', 'categories', 'notes')
+
+    date: date
+    site: str
+    total: Optional[int]
+    ruse: Optional[int]
+    remote: Optional[int]
+    categories: Dict[str, int]
+    notes: str
+
+    @property
+    def key(self):
+        """Deduplication key (one record per site per day)"""
+        return (self.date, self.site)
+
+    @classmethod
+    def from_results(cls, site: str, results: Dict, day: Union[date, datetime],
+                     notes: str = "Daily scraping") -> "JobRecord":
+        """Build a record from scraper results"""
+        if isinstance(day, datetime):
+            day = day.date()
+        return cls(
+            date=day,
+            site=site,
+            total=_parse_count(results.get('total')),
+            ruse=_parse_count(results.get('ruse')),
+            remote=_parse_count(results.get('remote')),
+            categories=dict(results.get('raw_categories') or {}),
+            notes=notes
+        )
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "JobRecord":
+        """Build a record from a CSV row dict
+
+        Raises ValueError for a missing or invalid Date. A Categories_Detail
+        cell that does not parse (e.g. the old "Total categories: N, ..."
+        breakdown, or names with unescaped separators) is logged and left
+        out, keeping the row's counts.
+        """
+        day = datetime.strptime(row['Date'], DATE_FORMAT).date()
+        site = row.get('Site') or ""
+
+        try:
+            categories = parse_categories(row.get('Categories_Detail'))
+        except ValueError as e:
+            logging.warning(f"Ignoring categories of {site} on {day}: {e}")
+            categories = {}
+
+        return cls(
+            date=day,
+            site=site,
+            total=_parse_count(row.get('Total_Jobs')),
+            ruse=_parse_count(row.get('Ruse_Jobs')),
+            remote=_parse_count(row.get('Remote_Jobs')),
+            categories=categories,
+            notes=row.get('Notes') or ""
+        )
+
+    def to_row(self) -> Dict:
+        """Convert the record to a CSV row dict"""
+        return {
+            'Date': self.date.strftime(DATE_FORMAT),
+            'Site': self.site,
+            'Total_Jobs': self.total,
+            'Ruse_Jobs': self.ruse,
+            'Remote_Jobs': self.remote,
+            'Categories_Count': len(self.categories),
+            'Categories_Detail': format_categories(self.categories),
+            'Notes': self.notes
+        }
+
+
+def iter_job_records(csv_path: Path) -> Iterator[JobRecord]:
+    """Stream records from a monthly CSV file one row at a time
+
+    Rows without a valid Date are logged with their line number and not
+    yielded; the file itself is never modified.
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                yield JobRecord.from_row(row)
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Skipping invalid row at {csv_path}:{reader.line_num}: {e}")
+
+
+def iter_all_records(data_dir: Path) -> Iterator[JobRecord]:
+    """Stream records from every monthly CSV file under the data directory"""
+    for csv_path in sorted(Path(data_dir).glob("*/*.csv")):
+        yield from iter_job_records(csv_path)
+
+
+class JobColumns:
+    """Array-backed columnar storage for many records
+
+    Counts are kept in int64 arrays with MISSING_COUNT for missing values and
+    dates as int64 days since the Unix epoch, so the buffers can be exposed to
+    NumPy without copying. Once exported, the columns are read-only: an
+    array cannot be resized while NumPy views of it exist.
+    """
+
+    __slots__ = ('dates', 'sites', 'totals', 'ruse', 'remote', 'categories', 'notes', '_exported')
+
+    def __init__(self):
+        self.dates = array('q')
+        self.sites: List[str] = []
+        self.totals = array('q')
+        self.ruse = array('q')
+        self.remote = array('q')
+        self.categories: List[Dict[str, int]] = []
+        self.notes: List[str] = []
+        self._exported = False
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def append(self, record: JobRecord) -> None:
+        """Append a single record"""
+        if self._exported:
+            raise RuntimeError("JobColumns cannot be appended to after to_numpy()/to_dataframe()")
+        self.dates.append(record.date.toordinal() - _EPOCH_ORDINAL)
+        self.sites.append(record.site)
+        self.totals.append(MISSING_COUNT if record.total is None else record.total)
+        self.ruse.append(MISSING_COUNT if record.ruse is None else record.ruse)
+        self.remote.append(MISSING_COUNT if record.remote is None else record.remote)
+        self.categories.append(record.categories)
+        self.notes.append(record.notes)
+
+    @classmethod
+    def from_records(cls, records: Iterable[JobRecord]) -> "JobColumns":
+        """Build columns from a (possibly streaming) iterable of records"""
+        columns = cls()
+        for record in records:
+            columns.append(record)
+        return columns
+
+    def to_numpy(self) -> Dict:
+        """Return NumPy views over the column buffers (no copy)"""
+        import numpy as np
+
+        self._exported = True
+        return {
+            'date': np.frombuffer(self.dates, dtype=np.int64).view('datetime64[D]'),
+            'total': np.frombuffer(self.totals, dtype=np.int64),
+            'ruse': np.frombuffer(self.ruse, dtype=np.int64),
+            'remote': np.frombuffer(self.remote, dtype=np.int64),
+        }
+
+    def to_dataframe(self):
+        """Return a pandas DataFrame over the column buffers
+
+        Count columns use the nullable Int64 dtype and share memory with the
+        buffers; missing values are masked. pandas has no day resolution, so
+        the Date column is converted to datetime64[s] (a copy).
+        """
+        import pandas as pd
+
+        arrays = self.to_numpy()
+        data = {'Date': arrays['date'], 'Site': self.sites}
+        for name, column in (('Total_Jobs', 'total'), ('Ruse_Jobs', 'ruse'), ('Remote_Jobs', 'remote')):
+            values = arrays[column]
+            data[name] = pd.arrays.IntegerArray(values, values == MISSING_COUNT)
+        data['Categories_Count'] = [len(c) for c in self.categories]
+        data['Notes'] = self.notes
+        return pd.DataFrame(data, copy=False)
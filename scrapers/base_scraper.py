@@ -3,16 +3,72 @@ import requests
 import time
 import re
 import logging
+import math
+import queue
+import threading
+from collections import deque
+from contextlib import nullcontext
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
-from typing import Dict, Optional, List
+from typing import Any, Dict, List, Optional, Tuple
 
 # Simple configuration constants (avoiding complex imports)
 REQUEST_TIMEOUT = 30
 REQUEST_RETRIES = 3
 REQUEST_DELAY = 2  # Increased delay to be more polite
+# Hedged requests: if a response is slower than the host's observed p95
+# latency, send one duplicate request and keep whichever answers first
+HEDGE_DELAY = 5  # seconds, used until a host has enough latency samples
+HEDGE_MIN_SAMPLES = 5
+HEDGE_MAX_PER_SITE = 3  # politeness limit on duplicate requests per scraper
+LATENCY_WINDOW = 50  # recent samples kept per host
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 
+# Recent response latencies per host, shared by all scrapers in the run
+_host_latencies: Dict[str, deque] = {}
+_latency_lock = threading.Lock()
+
+
+def record_latency(host: str, seconds: float) -> None:
+    """Record a response latency for a host"""
+    with _latency_lock:
+        _host_latencies.setdefault(host, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def hedge_delay(host: str) -> float:
+    """Delay before hedging a request to host: observed p95, or HEDGE_DELAY"""
+    with _latency_lock:
+        samples = sorted(_host_latencies.get(host, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DELAY
+    return samples[math.ceil(0.95 * len(samples)) - 1]
+
+
+class Deadline:
+    """Wall-clock time budget for a run or a site (None means unbounded)"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Whether the budget is exhausted"""
+        return self.remaining() == 0.0
+
+    def child(self, seconds: Optional[float]) -> "Deadline":
+        """Sub-budget of at most seconds that never outlives this deadline"""
+        remaining = self.remaining()
+        if seconds is None or (remaining is not None and remaining < seconds):
+            seconds = remaining
+        return Deadline(seconds)
+
+
 class BaseScraper(ABC):
     """Base scraper class for job sites"""
 
@@ -23,6 +79,15 @@ class BaseScraper(ABC):
         self.selectors = config.get('selectors', {})
         self.logger = logging.getLogger(f"{__name__}.{site_name}")
 
+        # Optional RunProfiler, set by main.py when profiling is enabled
+        self.profiler = None
+
+        # Time budget for this site, set by main.py; results are partial
+        # when it runs out before all pages were fetched
+        self.deadline = Deadline()
+        self.deadline_exceeded = False
+        self.hedges_sent = 0
+
         # Setup session
         self.session = requests.Session()
         self.session.headers.update({
@@ -41,9 +106,12 @@ class BaseScraper(ABC):
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
         """Fetch and parse a webpage with proper encoding handling"""
         for attempt in range(REQUEST_RETRIES):
+            if self._check_deadline(url):
+                return None
             try:
                 self.logger.info(f"Fetching {url} (attempt {attempt + 1})")
-                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+                with self._stage("fetch"):
+                    response = self.get(url)
                 response.raise_for_status()
 
                 # Set proper encoding to handle Bulgarian characters
@@ -51,30 +119,203 @@ class BaseScraper(ABC):
                     response.encoding = 'utf-8'
 
                 # Parse with proper encoding
-                soup = BeautifulSoup(response.content, 'html.parser', from_encoding='utf-8')
-                time.sleep(REQUEST_DELAY)  # Be nice to the server
+                with self._stage("parse"):
+                    soup = BeautifulSoup(response.content, 'html.parser', from_encoding='utf-8')
+                self._sleep(REQUEST_DELAY)  # Be nice to the server
                 return soup
 
             except requests.RequestException as e:
                 self.logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if self._check_deadline(url):
+                    return None
                 if attempt < REQUEST_RETRIES - 1:
-                    time.sleep(REQUEST_DELAY * (attempt + 1))
+                    self._sleep(REQUEST_DELAY * (attempt + 1))
                 else:
                     self.logger.error(f"Failed to fetch {url} after {REQUEST_RETRIES} attempts")
                     return None
 
+    def fetch_json(self, url: str):
+        """Fetch and decode a JSON document (e.g. a WP REST endpoint)"""
+        return self.fetch_json_with_headers(url)[0]
+
+    def fetch_json_with_headers(self, url: str) -> Tuple[Any, Dict]:
+        """Fetch a JSON document, returning (data, response headers)
+
+        Data is None and headers are empty when the fetch fails.
+        """
+        headers = {'Accept': 'application/json'}
+        for attempt in range(REQUEST_RETRIES):
+            if self._check_deadline(url):
+                return None, {}
+            try:
+                self.logger.info(f"Fetching JSON {url} (attempt {attempt + 1})")
+                with self._stage("fetch"):
+                    response = self.get(url, headers=headers)
+                response.raise_for_status()
+
+                with self._stage("parse_json"):
+                    data = response.json()
+                self.logger.debug(f"Received {len(response.content)} bytes of JSON from {url}")
+                self._sleep(REQUEST_DELAY)  # Be nice to the server
+                return data, response.headers
+
+            except ValueError as e:
+                # Not JSON (e.g. an HTML error page) - retrying will not help
+                self.logger.warning(f"Invalid JSON from {url}: {e}")
+                return None, {}
+            except requests.RequestException as e:
+                status = getattr(e.response, 'status_code', None)
+                if status is not None and 400 <= status < 500:
+                    # Endpoint missing or forbidden - let the caller fall back
+                    self.logger.warning(f"JSON endpoint {url} returned {status}")
+                    return None, {}
+                self.logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if self._check_deadline(url):
+                    return None, {}
+                if attempt < REQUEST_RETRIES - 1:
+                    self._sleep(REQUEST_DELAY * (attempt + 1))
+                else:
+                    self.logger.error(f"Failed to fetch {url} after {REQUEST_RETRIES} attempts")
+                    return None, {}
+
+    def get(self, url: str, headers: Optional[Dict] = None) -> requests.Response:
+        """GET a URL within the deadline, hedging slow requests
+
+        Raises requests.Timeout when the deadline runs out before any
+        response arrives, even if the server keeps trickling bytes.
+        """
+        timeout = REQUEST_TIMEOUT
+        remaining = self.deadline.remaining()
+        if remaining is not None:
+            timeout = max(1.0, min(timeout, remaining))
+
+        host = urlparse(url).netloc
+        started = time.perf_counter()
+
+        delay = hedge_delay(host)
+        if self.hedges_sent >= HEDGE_MAX_PER_SITE or delay >= timeout:
+            delay = None
+        response = self._race(url, headers, timeout, delay)
+
+        record_latency(host, time.perf_counter() - started)
+        return response
+
+    def _new_session(self) -> requests.Session:
+        """Copy of self.session (headers and cookies) for a hedged request"""
+        session = requests.Session()
+        session.headers.update(self.session.headers)
+        session.cookies.update(self.session.cookies)
+        return session
+
+    def _race(self, url: str, headers: Optional[Dict], timeout: float,
+              hedge_after: Optional[float]) -> requests.Response:
+        """Run the request on self.session, plus one hedge after hedge_after seconds
+
+        Requests run in daemon threads so the wait can be bounded by the
+        deadline. The hedge gets its own session, opened only when it fires;
+        if it wins it becomes self.session, so a request that lost or was
+        abandoned never shares a session with later fetches.
+        """
+        results = queue.Queue()
+        primary = self.session
+
+        def run(session):
+            try:
+                with self._profile_thread():
+                    response = session.get(url, headers=headers, timeout=timeout)
+                results.put((session, response, None))
+            except Exception as e:
+                results.put((session, None, e))
+            finally:
+                # Sessions that are no longer in use are closed by their last request
+                if session is not self.session:
+                    session.close()
+
+        def launch(session):
+            threading.Thread(target=run, args=(session,), daemon=True).start()
+
+        launch(primary)
+        in_flight = 1
+        hedge_at = None if hedge_after is None else time.monotonic() + hedge_after
+        primary_done = False
+        error = None
+
+        while in_flight:
+            wait_for = self.deadline.remaining()
+            if hedge_at is not None:
+                until_hedge = max(0.0, hedge_at - time.monotonic())
+                wait_for = until_hedge if wait_for is None else min(wait_for, until_hedge)
+
+            try:
+                session, response, exc = results.get(timeout=wait_for)
+            except queue.Empty:
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    hedge_at = None
+                    self.hedges_sent += 1
+                    self.logger.info(f"No response from {url} after {hedge_after:.2f}s, sending hedged request")
+                    launch(self._new_session())
+                    in_flight += 1
+                elif self.deadline.expired():
+                    # The abandoned request keeps running on its own session
+                    self.session = self._new_session()
+                    self.deadline_exceeded = True
+                    raise requests.Timeout(f"Deadline exceeded waiting for {url}")
+                continue
+
+            in_flight -= 1
+            primary_done = primary_done or session is primary
+            if exc is None:
+                if session is not primary:
+                    # The hedge won; keep its session (and any cookies it got)
+                    self.session = session
+                    if primary_done:
+                        primary.close()
+                return response
+            error = exc
+
+        raise error
+
+    def _check_deadline(self, url: str) -> bool:
+        """Whether the site's time budget is exhausted, marking results partial"""
+        if not self.deadline.expired():
+            return False
+        self.deadline_exceeded = True
+        self.logger.warning(f"Deadline exceeded, skipping {url}")
+        return True
+
+    def _sleep(self, seconds: float) -> None:
+        """Sleep for politeness without overrunning the deadline"""
+        remaining = self.deadline.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        time.sleep(seconds)
+
+    def _profile_thread(self):
+        """Profile a request thread, no-op when profiling is off"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.thread()
+
+    def _stage(self, name: str):
+        """Profiling stage for this scraper, no-op when profiling is off"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name, self.site_name)
+
     def extract_job_count(self, soup: BeautifulSoup) -> Optional[int]:
         """Extract job count from page using selectors and patterns"""
         if not soup:
             return None
 
         # First try regex patterns on full page text (more reliable for dev.bg)
-        page_text = soup.get_text()
+        with self._stage("get_text"):
+            page_text = soup.get_text()
         all_numbers = []
 
         for pattern in self.selectors.get('fallback_patterns', []):
             try:
-                matches = re.findall(pattern, page_text, re.IGNORECASE)
+                with self._stage("regex"):
+                    matches = re.findall(pattern, page_text, re.IGNORECASE)
                 self.logger.debug(f"Pattern '{pattern}' found matches: {matches}")
                 for match in matches:
                     if isinstance(match, str) and match.isdigit():
@@ -93,7 +334,8 @@ class BaseScraper(ABC):
         # Try CSS selectors as fallback
         for selector in self.selectors.get('job_count', []):
             try:
-                elements = soup.select(selector)
+                with self._stage("select"):
+                    elements = soup.select(selector)
                 for element in elements:
                     text = element.get_text(strip=True)
                     numbers = re.findall(r'\d+', text)
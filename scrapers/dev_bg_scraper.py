@@ -1,6 +1,12 @@
 from typing import Dict, Optional, List
 from base_scraper import BaseScraper
+import html
+import json
 import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Upper bound on WP REST pages followed per endpoint (100 terms per page)
+REST_MAX_PAGES = 20
 
 
 class DevBgScraper(BaseScraper):
@@ -9,12 +15,114 @@ class DevBgScraper(BaseScraper):
     def __init__(self, config: Dict):
         super().__init__("dev.bg", config)
 
+    def categories_from_terms(self, terms) -> Dict[str, int]:
+        """Build a category mapping from WordPress taxonomy terms
+
+        Only top-level terms are kept so that sub-categories are not counted
+        twice in the total.
+        """
+        categories = {}
+        if not isinstance(terms, list):
+            return categories
+
+        for term in terms:
+            if not isinstance(term, dict):
+                continue
+            name = term.get('name')
+            count = term.get('count')
+            if not isinstance(name, str) or not isinstance(count, int) or isinstance(count, bool):
+                continue
+            if term.get('parent', 0) not in (0, None):
+                continue
+            if count > 0:
+                categories[html.unescape(name).strip()] = count
+
+        return categories
+
+    def _page_url(self, url: str, page: int) -> str:
+        """Return url with its WP REST "page" query parameter set"""
+        parts = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(parts.query) if k != 'page']
+        query.append(('page', str(page)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def fetch_rest_terms(self, url: str) -> Optional[List]:
+        """Fetch all pages of a WP REST collection, None if incomplete"""
+        terms, headers = self.fetch_json_with_headers(url)
+        if not isinstance(terms, list):
+            return None
+
+        try:
+            total_pages = int(headers.get('X-WP-TotalPages', 1))
+        except (TypeError, ValueError):
+            total_pages = 1
+
+        if total_pages > REST_MAX_PAGES:
+            # A partial term list would silently undercount the total
+            self.logger.warning(f"{url} has {total_pages} pages (limit {REST_MAX_PAGES}), skipping")
+            return None
+
+        for page in range(2, total_pages + 1):
+            page_terms = self.fetch_json(self._page_url(url, page))
+            if not isinstance(page_terms, list):
+                self.logger.warning(f"Could not fetch page {page}/{total_pages} of {url}")
+                return None
+            terms.extend(page_terms)
+
+        return terms
+
+    def extract_rest_categories(self) -> Dict[str, int]:
+        """Extract category counts from WP REST taxonomy endpoints"""
+        for url in self.config.get('structured', {}).get('rest_endpoints', []):
+            terms = self.fetch_rest_terms(url)
+            categories = self.categories_from_terms(terms)
+            if categories:
+                self.logger.info(f"Found {len(categories)} categories via WP REST: {url}")
+                return categories
+            self.logger.warning(f"No usable taxonomy terms from {url}")
+
+        return {}
+
+    def extract_embedded_categories(self, soup) -> Dict[str, int]:
+        """Extract category counts from JSON embedded in the page
+
+        Only containers listed under structured.embedded_json in sites.json
+        are read: a script element id and an optional key holding the list
+        of terms. Other JSON on the page is ignored.
+        """
+        if not soup:
+            return {}
+
+        for container in self.config.get('structured', {}).get('embedded_json', []):
+            script = soup.find('script', id=container.get('script_id'))
+            if not script:
+                continue
+
+            try:
+                with self._stage("parse_json"):
+                    data = json.loads(script.string or "")
+            except ValueError as e:
+                self.logger.warning(f"Invalid JSON in script #{container.get('script_id')}: {e}")
+                continue
+
+            key = container.get('key')
+            if key:
+                data = data.get(key) if isinstance(data, dict) else None
+
+            categories = self.categories_from_terms(data)
+            if categories:
+                self.logger.info(f"Found {len(categories)} categories in embedded JSON #{container.get('script_id')}")
+                return categories
+
+        return {}
+
     def extract_all_categories(self, soup) -> Dict[str, int]:
-        """Extract job counts for all categories from main page"""
+        """Extract job counts for all categories from main page text"""
         if not soup:
             return {}
 
-        page_text = soup.get_text()
+        with self._stage("get_text"):
+            page_text = soup.get_text()
         categories = {}
 
         # Multiple patterns to handle encoding issues
@@ -29,7 +137,8 @@ class DevBgScraper(BaseScraper):
 
         for pattern in patterns:
             try:
-                matches = re.findall(pattern, page_text, re.IGNORECASE | re.UNICODE)
+                with self._stage("regex"):
+                    matches = re.findall(pattern, page_text, re.IGNORECASE | re.UNICODE)
                 if matches:
                     self.logger.debug(f"Pattern '{pattern}' found: {matches}")
                     for match in matches:
@@ -46,7 +155,8 @@ class DevBgScraper(BaseScraper):
             self.logger.warning("No job patterns found, looking for reasonable job count numbers")
 
             # Find all numbers and filter for reasonable job counts
-            number_matches = re.findall(r'\b(\d+)\b', page_text)
+            with self._stage("regex"):
+                number_matches = re.findall(r'\b(\d+)\b', page_text)
             potential_numbers = []
 
             for n in number_matches:
@@ -83,13 +193,23 @@ class DevBgScraper(BaseScraper):
         """Scrape detailed breakdown of all job categories"""
         self.logger.info("Starting detailed dev.bg category scraping")
 
-        # Scrape main page for all categories
-        soup = self.fetch_page(self.urls.get('total'))
-        if not soup:
-            return {'error': 'Could not fetch main page'}
+        # Structured sources first: WP REST, then JSON embedded in the page,
+        # then regex over the page text as a last resort
+        categories = self.extract_rest_categories()
+        source = 'rest'
+
+        if not categories:
+            soup = self.fetch_page(self.urls.get('total'))
+            if not soup:
+                return {'error': 'Could not fetch main page'}
+
+            categories = self.extract_embedded_categories(soup)
+            source = 'embedded_json'
 
-        # Extract all categories
-        categories = self.extract_all_categories(soup)
+            if not categories:
+                self.logger.warning("No structured category data, falling back to HTML text extraction")
+                categories = self.extract_all_categories(soup)
+                source = 'html'
 
         if not categories:
             self.logger.error("No categories found")
@@ -119,10 +239,10 @@ class DevBgScraper(BaseScraper):
             'ruse': ruse_count,
             'remote': remote_count,
             'categories': categories,
-            'category_breakdown': f"Total categories: {len(categories)}, Jobs per category: {list(categories.values())}"
+            'source': source
         }
 
-        self.logger.info(f"dev.bg detailed results: Total={total_jobs}, Categories={len(categories)}")
+        self.logger.info(f"dev.bg detailed results: Total={total_jobs}, Categories={len(categories)}, Source={source}")
         return result
 
     def scrape(self) -> Dict[str, Optional[int]]:
@@ -134,6 +254,6 @@ class DevBgScraper(BaseScraper):
             'total': detailed_results.get('total'),
             'ruse': detailed_results.get('ruse'),
             'remote': detailed_results.get('remote'),
-            'categories_detail': detailed_results.get('category_breakdown', ''),
-            'raw_categories': detailed_results.get('categories', {})
+            'raw_categories': detailed_results.get('categories', {}),
+            'source': detailed_results.get('source')
         }
\ No newline at end of file
@@ -3,14 +3,110 @@
 Test script for detailed dev.bg category scraping
 """
 
+import copy
+import csv
+import json
 import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
 # Add scrapers directory to path
 current_dir = Path(__file__).parent
 scrapers_dir = current_dir / "scrapers"
 sys.path.insert(0, str(scrapers_dir))
 
+# Recorded dev.bg responses, served locally by start_fixture_server()
+FIXTURES_DIR = current_dir / "fixtures"
+FIXTURE_PORT = 8765
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler without per-request console output
+
+    Mimics WP REST pagination: "name.json" with sibling "name.pageN.json"
+    files is served page by page via ?page=N with an X-WP-TotalPages header.
+    """
+
+    total_pages = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def translate_path(self, path):
+        fs_path = Path(super().translate_path(path))
+        if fs_path.suffix != ".json":
+            return str(fs_path)
+
+        pages = list(fs_path.parent.glob(f"{fs_path.stem}.page*.json"))
+        if pages:
+            self.total_pages = len(pages) + 1
+            page = int(parse_qs(urlsplit(path).query).get("page", ["1"])[0])
+            if page > 1:
+                fs_path = fs_path.with_name(f"{fs_path.stem}.page{page}.json")
+        return str(fs_path)
+
+    def end_headers(self):
+        if self.total_pages:
+            self.send_header("X-WP-TotalPages", str(self.total_pages))
+        super().end_headers()
+
+
+class SlowHandler(QuietHandler):
+    """Handler for hedging/deadline tests
+
+    The first request for each URL with a "stall" query parameter stalls
+    before answering, and /trickle/ sends its body one byte at a time, so
+    no single socket read ever times out.
+    """
+
+    stalled_paths = set()
+
+    def do_GET(self):
+        if self.path.startswith("/trickle/"):
+            body = b"x" * 40
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            for byte in body:
+                self.wfile.write(bytes([byte]))
+                self.wfile.flush()
+                time.sleep(0.25)
+            return
+
+        if "stall=" in self.path and self.path not in SlowHandler.stalled_paths:
+            SlowHandler.stalled_paths.add(self.path)
+            time.sleep(3)
+        super().do_GET()
+
+
+def start_fixture_server(port: int = FIXTURE_PORT, handler_class=QuietHandler) -> ThreadingHTTPServer:
+    """Serve fixtures/dev.bg on localhost in a background thread"""
+    handler = partial(handler_class, directory=str(FIXTURES_DIR / "dev.bg"))
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@contextmanager
+def temp_data_dir():
+    """Point utils.save_job_data at a temporary data directory"""
+    import utils
+
+    original = utils.DATA_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.DATA_DIR = Path(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            utils.DATA_DIR = original
+
 
 def test_detailed_dev_bg():
     """Test detailed dev.bg category scraping"""
@@ -108,9 +204,317 @@ def test_manual_regex():
         print(f"❌ Manual test failed: {e}")
 
 
+def test_records_offline():
+    """Test CSV -> records -> columns -> DataFrame and CSV round trips"""
+    print("\n=== Offline records test ===")
+
+    try:
+        import numpy as np
+        from records import JobColumns, JobRecord, iter_job_records
+        from utils import CSV_COLUMNS, get_csv_path, save_job_data
+
+        date = datetime(2025, 6, 11)
+        categories = {"UI/UX, Arts": 37, "PM/BA и още": 187, "a:b\\c": 2}
+
+        with temp_data_dir():
+            csv_path = get_csv_path(date)
+            existing = [
+                {"Date": "2025-06-10", "Site": "jobs.bg", "Total_Jobs": "", "Ruse_Jobs": "", "Remote_Jobs": "",
+                 "Categories_Count": "", "Categories_Detail": "", "Notes": "Daily scraping"},
+                {"Date": "2025-06-10", "Site": "dev.bg", "Total_Jobs": "30", "Ruse_Jobs": "", "Remote_Jobs": "",
+                 "Categories_Count": "3", "Categories_Detail": "Total categories: 3, Jobs per category: [10, 10, 10]",
+                 "Notes": "Daily scraping"},
+                {"Date": "2025-06-09", "Site": "dev.bg", "Total_Jobs": "40", "Ruse_Jobs": "2", "Remote_Jobs": "",
+                 "Categories_Count": "1", "Categories_Detail": "UI/UX, Arts:37", "Notes": "Daily scraping"},
+                {"Date": "2025-06-xx", "Site": "dev.bg", "Total_Jobs": "50", "Ruse_Jobs": "", "Remote_Jobs": "",
+                 "Categories_Count": "", "Categories_Detail": "", "Notes": "Bad date"},
+            ]
+            with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+                writer.writeheader()
+                writer.writerows(existing)
+
+            results = {"total": 226, "ruse": 3, "remote": None, "raw_categories": categories}
+            save_job_data([JobRecord.from_results("dev.bg", results, date)], date)
+
+            with open(csv_path, encoding="utf-8", newline="") as f:
+                rows = list(csv.DictReader(f))
+            ok = len(rows) == len(existing) + 1 and all(row in rows for row in existing)
+            print(f"{'✅' if ok else '❌'} Existing rows written back unchanged")
+            if not ok:
+                return False
+
+            # Only the bad-date row is skipped; legacy category cells keep their counts
+            records = list(iter_job_records(csv_path))
+            loaded = [(str(r.date), r.site, r.total, r.categories) for r in records[:3]]
+            ok = loaded == [
+                ("2025-06-09", "dev.bg", 40, {}),
+                ("2025-06-10", "dev.bg", 30, {}),
+                ("2025-06-10", "jobs.bg", None, {}),
+            ]
+            ok = ok and len(records) == 4 and records[-1].categories == categories
+            print(f"{'✅' if ok else '❌'} Legacy rows loaded with counts: {loaded}")
+            print(f"{'✅' if ok else '❌'} Reloaded categories: {records[-1].categories}")
+            if not ok:
+                return False
+
+        columns = JobColumns.from_records(records)
+        df = columns.to_dataframe()
+        totals = columns.to_numpy()["total"]
+        ok = str(df["Date"].iloc[3].date()) == "2025-06-11" and df["Total_Jobs"].iloc[3] == 226
+        ok = ok and df["Total_Jobs"].iloc[1] == 30 and df["Total_Jobs"].isna().iloc[2]
+        ok = ok and df["Remote_Jobs"].isna().all()
+        ok = ok and np.shares_memory(df["Total_Jobs"].array._data, totals)
+        print(f"{'✅' if ok else '❌'} DataFrame over column buffers:\n{df}")
+        if not ok:
+            return False
+
+        try:
+            columns.append(records[0])
+            print("❌ append() after export did not raise")
+            return False
+        except RuntimeError:
+            print("✅ append() after export raises")
+        return True
+
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_structured_dev_bg_offline():
+    """Test structured (WP REST / embedded JSON) extraction against local fixtures"""
+    print("\n=== Offline structured dev.bg test ===")
+
+    server = start_fixture_server()
+    try:
+        from utils import load_sites_config, setup_logging
+        from dev_bg_scraper import DevBgScraper
+
+        setup_logging("INFO")
+        config = load_sites_config(FIXTURES_DIR / "sites.json")["dev.bg"]
+
+        from records import JobRecord, iter_job_records
+        from utils import save_job_data
+
+        expected = {}
+        for fixture in sorted((FIXTURES_DIR / "dev.bg" / "wp-json" / "wp" / "v2").glob("job_category*.json")):
+            with open(fixture, encoding="utf-8") as f:
+                expected.update({t["name"].replace("&amp;", "&"): t["count"] for t in json.load(f) if t["parent"] == 0})
+
+        # WP REST endpoint available
+        results = DevBgScraper(config).scrape()
+        ok = results["source"] == "rest" and results["raw_categories"] == expected
+        ok = ok and results["total"] == sum(expected.values())
+        ok = ok and results["ruse"] == 14 and results["remote"] == 487
+        print(f"{'✅' if ok else '❌'} WP REST (2 pages): {results['total']} jobs in {len(results['raw_categories'])} categories")
+        if not ok:
+            return False
+
+        # Category names (e.g. "UI/UX, Arts") survive a save and reload
+        date = datetime(2025, 6, 11)
+        with temp_data_dir():
+            csv_path = save_job_data([JobRecord.from_results("dev.bg", results, date)], date)
+            reloaded = next(iter_job_records(csv_path)).categories
+        ok = reloaded == expected and list(reloaded) == list(results["raw_categories"])
+        print(f"{'✅' if ok else '❌'} Category names unchanged after save/reload")
+        if not ok:
+            return False
+
+        # REST endpoint missing -> JSON embedded in the page
+        embedded_config = copy.deepcopy(config)
+        embedded_config["structured"]["rest_endpoints"] = [
+            f"http://127.0.0.1:{FIXTURE_PORT}/wp-json/wp/v2/missing.json"
+        ]
+        results = DevBgScraper(embedded_config).scrape()
+        ok = results["source"] == "embedded_json" and results["total"] == 612 + 241 + 176
+        print(f"{'✅' if ok else '❌'} Embedded JSON: {results['raw_categories']}")
+        if not ok:
+            return False
+
+        # No category JSON (only an unrelated widget) -> regex over page text
+        html_config = copy.deepcopy(config)
+        html_config["structured"]["rest_endpoints"] = []
+        html_config["urls"]["total"] = f"http://127.0.0.1:{FIXTURE_PORT}/no-category-json/"
+        results = DevBgScraper(html_config).scrape()
+        ok = results["source"] == "html" and sorted(results["raw_categories"].values()) == [176, 241, 612]
+        print(f"{'✅' if ok else '❌'} HTML fallback: {results['raw_categories']}")
+        return ok
+
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_profiling_offline():
+    """Test main.py --profile against the local fixture server"""
+    print("\n=== Offline profiling test ===")
+
+    server = start_fixture_server()
+    try:
+        import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            success = main.main([
+                "--profile", "--dry-run",
+                "--config", str(FIXTURES_DIR / "sites.json"),
+                "--profile-dir", tmp
+            ])
+            run_dirs = list(Path(tmp).iterdir())
+            ok = success and len(run_dirs) == 1
+            if ok:
+                files = {p.name for p in run_dirs[0].iterdir()}
+                expected = {"summary.json", "dev_bg_scrape.prof", "dev_bg_scrape.txt", "dev_bg_scrape.alloc.txt"}
+                with open(run_dirs[0] / "summary.json", encoding="utf-8") as f:
+                    stages = json.load(f)["stages"]
+                ok = expected <= files and {"dev.bg/scrape", "dev.bg/fetch", "dev.bg/parse_json"} <= set(stages)
+                print(f"{'✅' if ok else '❌'} Profile artifacts: {sorted(files)}")
+
+                # Request threads are merged into the site's cProfile report
+                report = (run_dirs[0] / "dev_bg_scrape.txt").read_text(encoding="utf-8")
+                ok = "adapters.py" in report
+                print(f"{'✅' if ok else '❌'} Request threads included in profile report")
+            else:
+                print("❌ Profiled run failed")
+        return ok
+
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_hedging_and_deadline_offline():
+    """Test hedged requests and the per-site deadline against local fixtures"""
+    print("\n=== Offline hedging / deadline test ===")
+
+    import base_scraper
+
+    server = start_fixture_server(handler_class=SlowHandler)
+    hedge_delay = base_scraper.HEDGE_DELAY
+    try:
+        from utils import load_sites_config
+        from base_scraper import Deadline, record_latency
+        from dev_bg_scraper import DevBgScraper
+
+        config = load_sites_config(FIXTURES_DIR / "sites.json")["dev.bg"]
+        rest_url = config["structured"]["rest_endpoints"][0]
+        host = f"127.0.0.1:{FIXTURE_PORT}"
+
+        # p95 of the recorded samples, once there are enough of them
+        base_scraper._host_latencies.clear()
+        for i in range(1, 21):
+            record_latency("example.test", i / 10)
+        delay = base_scraper.hedge_delay("example.test")
+        ok = abs(delay - 1.9) < 1e-9 and base_scraper.hedge_delay("other.test") == base_scraper.HEDGE_DELAY
+        print(f"{'✅' if ok else '❌'} Hedge delay is the host p95 ({delay:.2f}s)")
+        if not ok:
+            return False
+
+        # Non-hedged request reuses the scraper's session
+        base_scraper._host_latencies.clear()
+        scraper = DevBgScraper(config)
+        session = scraper.session
+        response = scraper.get(rest_url)
+        ok = response.ok and scraper.hedges_sent == 0 and scraper.session is session
+        print(f"{'✅' if ok else '❌'} Fast request used the scraper session without hedging")
+        if not ok:
+            return False
+
+        # No samples for the host: the stalled first response is hedged after HEDGE_DELAY
+        base_scraper._host_latencies.clear()
+        base_scraper.HEDGE_DELAY = 0.5
+        scraper = DevBgScraper(config)
+        started = time.perf_counter()
+        response = scraper.get(f"{rest_url}?stall=1")
+        elapsed = time.perf_counter() - started
+        ok = response.ok and scraper.hedges_sent == 1 and 0.5 <= elapsed < 1.5
+        ok = ok and scraper.session is not session
+        print(f"{'✅' if ok else '❌'} Hedged after HEDGE_DELAY, answered in {elapsed:.2f}s")
+        if not ok:
+            return False
+
+        # Enough samples for the host: hedged at its p95 (0.4s), not HEDGE_DELAY (10s)
+        base_scraper._host_latencies.clear()
+        base_scraper.HEDGE_DELAY = 10
+        for latency in (0.2, 0.2, 0.2, 0.2, 0.4):
+            record_latency(host, latency)
+        scraper = DevBgScraper(config)
+        started = time.perf_counter()
+        response = scraper.get(f"{rest_url}?stall=2")
+        elapsed = time.perf_counter() - started
+        ok = response.ok and scraper.hedges_sent == 1 and 0.4 <= elapsed < 1.5
+        print(f"{'✅' if ok else '❌'} Hedged at host p95, answered in {elapsed:.2f}s")
+        if not ok:
+            return False
+        base_scraper._host_latencies.clear()
+        base_scraper.HEDGE_DELAY = hedge_delay
+
+        # Server trickles bytes past the deadline -> bounded wait, marked partial
+        scraper = DevBgScraper(config)
+        scraper.deadline = Deadline(1.5)
+        started = time.perf_counter()
+        soup = scraper.fetch_page(f"http://127.0.0.1:{FIXTURE_PORT}/trickle/")
+        elapsed = time.perf_counter() - started
+        ok = soup is None and scraper.deadline_exceeded and elapsed < 2.5
+        print(f"{'✅' if ok else '❌'} Trickling response abandoned after {elapsed:.2f}s, partial={scraper.deadline_exceeded}")
+        if not ok:
+            return False
+
+        # Exhausted budget -> no requests, results marked partial
+        scraper = DevBgScraper(config)
+        scraper.deadline = Deadline(0)
+        started = time.perf_counter()
+        results = scraper.scrape()
+        elapsed = time.perf_counter() - started
+        ok = scraper.deadline_exceeded and results["total"] is None and elapsed < 1
+        print(f"{'✅' if ok else '❌'} Expired deadline returned in {elapsed:.2f}s, partial={scraper.deadline_exceeded}")
+        return ok
+
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        base_scraper._host_latencies.clear()
+        base_scraper.HEDGE_DELAY = hedge_delay
+        server.shutdown()
+        server.server_close()
+
+
 if __name__ == "__main__":
     print("=== Detailed Dev.BG Category Test ===")
 
+    if "--serve" in sys.argv:
+        # Fixture server for manual runs, e.g. main.py --config fixtures/sites.json
+        server = start_fixture_server()
+        print(f"Serving {FIXTURES_DIR / 'dev.bg'} on http://127.0.0.1:{FIXTURE_PORT}/ (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        sys.exit(0)
+
+    if "--offline" in sys.argv:
+        success = test_records_offline()
+        success = test_structured_dev_bg_offline() and success
+        success = test_profiling_offline() and success
+        success = test_hedging_and_deadline_offline() and success
+        print("\n=== Test completed ===")
+        sys.exit(0 if success else 1)
+
     # Manual regex test first
     test_manual_regex()
 
@@ -3,9 +3,11 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import git
 
+from records import JobRecord
+
 # Simple configuration constants
 PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -17,15 +19,16 @@ CSV_COLUMNS = [
 ]
 GIT_REPO_PATH = PROJECT_ROOT
 GIT_COMMIT_MESSAGE_TEMPLATE = "Daily job count update for {date}"
+LOG_FILE = Path('job_tracker.log')
 
 # Create directories if they don't exist
 DATA_DIR.mkdir(exist_ok=True)
 CONFIG_DIR.mkdir(exist_ok=True)
 
 
-def load_sites_config() -> Dict:
+def load_sites_config(config_path: Optional[Path] = None) -> Dict:
     """Load sites configuration from JSON file"""
-    config_path = CONFIG_DIR / "sites.json"
+    config_path = config_path or CONFIG_DIR / "sites.json"
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -48,48 +51,34 @@ def get_csv_path(date: datetime) -> Path:
     return year_dir / f"{month}-{year}.csv"
 
 
-def save_job_data(data_rows: List[Dict], date: datetime) -> Path:
-    """Save job data to CSV file"""
+def save_job_data(records: List[JobRecord], date: datetime) -> Path:
+    """Save job records to CSV file
+
+    Existing rows are streamed and written back unchanged; only rows with
+    the same Date and Site as a new record are replaced.
+    """
     csv_path = get_csv_path(date)
 
-    existing_data = []
+    # Keyed by (Date, Site) so later rows overwrite duplicates
+    rows = {}
 
-    # Load existing data if file exists
+    # Existing rows are kept verbatim. If the file cannot be read, fail
+    # rather than overwrite the month's history with only the new rows.
     if csv_path.exists():
-        try:
-            with open(csv_path, 'r', encoding='utf-8', newline='') as f:
-                reader = csv.DictReader(f)
-                existing_data = list(reader)
-        except Exception as e:
-            logging.warning(f"Could not read existing CSV file: {e}")
-            existing_data = []
-
-    # Combine existing and new data
-    all_data = existing_data + data_rows
-
-    # Remove duplicates based on Date and Site (keep last occurrence)
-    seen = {}
-    unique_data = []
-
-    for row in all_data:
-        key = (row.get('Date'), row.get('Site'))
-        seen[key] = row  # This will overwrite duplicates with latest
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                rows[(row.get('Date') or '', row.get('Site') or '')] = row
 
-    unique_data = list(seen.values())
+    # New data replaces existing rows for the same Date and Site
+    for record in records:
+        row = record.to_row()
+        rows[(row['Date'], row['Site'])] = row
 
-    # Sort by Date and Site
-    unique_data.sort(key=lambda x: (x.get('Date', ''), x.get('Site', '')))
-
-    # Write to CSV
+    # Write to CSV sorted by Date and Site (empty file still gets headers)
     with open(csv_path, 'w', encoding='utf-8', newline='') as f:
-        if unique_data:
-            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
-            writer.writeheader()
-            writer.writerows(unique_data)
-        else:
-            # Write empty file with headers
-            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
-            writer.writeheader()
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows[key] for key in sorted(rows))
 
     logging.info(f"Data saved to {csv_path}")
     return csv_path
@@ -149,33 +138,6 @@ def setup_logging(level: str = "INFO") -> None:
         format=log_format,
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler('job_tracker.log')
+            logging.FileHandler(LOG_FILE)
         ]
     )
-
-
-def format_job_data_row(site: str, results: Dict, date: datetime, notes: str = "Daily scraping") -> Dict:
-    """Format scraping results into CSV row format with detailed categories"""
-
-    # Handle detailed category information
-    categories_detail = ""
-    categories_count = 0
-
-    if 'raw_categories' in results and results['raw_categories']:
-        categories = results['raw_categories']
-        categories_count = len(categories)
-        # Format as "cat1:123, cat2:456, cat3:789"
-        categories_detail = ", ".join([f"{k}:{v}" for k, v in categories.items()])
-    elif 'categories_detail' in results:
-        categories_detail = results['categories_detail']
-
-    return {
-        'Date': date.strftime("%Y-%m-%d"),
-        'Site': site,
-        'Total_Jobs': results.get('total'),
-        'Ruse_Jobs': results.get('ruse'),
-        'Remote_Jobs': results.get('remote'),
-        'Categories_Count': categories_count,
-        'Categories_Detail': categories_detail,
-        'Notes': notes
-    }
\ No newline at end of file